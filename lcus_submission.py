@@ -1,15 +1,20 @@
 import os
-import json
+import argparse
 import time
 import datetime
 import sys
 import getpass
 import random
 import logging
+import threading
 from pathlib import Path
-from typing import Dict, Set, Optional
+from typing import Dict, List, Set, Optional, Union
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from selenium import webdriver
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
@@ -22,6 +27,7 @@ from webdriver_manager.chrome import ChromeDriverManager
 # Global Constants
 TIMESTAMP = datetime.datetime.today().strftime('%Y%m%d_%H%M%S')
 LEETCODE_URL = 'https://leetcode.com'
+SUBMISSIONS_API_URL = f'{LEETCODE_URL}/api/submissions/'
 BATCH_SIZE = 20  # Number of submissions to fetch per request
 MAX_WORKERS = 4  # Maximum number of parallel processing threads
 
@@ -78,11 +84,14 @@ def setup_logger():
     
     return logger
 
-@dataclass
+@dataclass(frozen=True)
 class Submission:
     """
     Data class representing a LeetCode submission.
     
+    Instances are created once per record, so the class declares
+    __slots__ to avoid a per-instance __dict__.
+    
     Attributes:
         title_slug (str): Problem identifier in URL-friendly format
         lang (str): Programming language of the submission
@@ -90,6 +99,8 @@ class Submission:
         status (str): Submission status (e.g., "Accepted", "Wrong Answer")
         code (str): Source code of the submission
     """
+    __slots__ = ('title_slug', 'lang', 'timestamp', 'status', 'code')
+    
     title_slug: str
     lang: str
     timestamp: int
@@ -111,20 +122,36 @@ class LeetCodeScraper:
     2. Accepted: Contains only the accepted solutions
     """
     
-    def __init__(self):
+    def __init__(self, batched_fsync: bool = False):
         """
         Initialize the scraper with user credentials and basic setup.
         
-        Sets up logging, prompts for credentials, and initializes storage directories.
-        Chrome WebDriver initialization is deferred until login.
+        Sets up logging, prompts for the username, and initializes storage directories.
+        The password prompt and Chrome WebDriver initialization are deferred until
+        a browser login is actually needed.
+        
+        Args:
+            batched_fsync (bool): Keep submission and accepted solution files open for
+                the duration of a batch and fsync them, and their directories, once
+                at batch end
         """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.username = input('Username: ')
-        self.password = getpass.getpass()
+        self.password: Optional[str] = None
+        self.cookie_path = Path(f'.cookies_{self.username}')
         self.driver = None
         self.wait = None
+        self.session: Optional[requests.Session] = None
         self.accepted_slugs: Set[str] = set()
+        self._index_lock = threading.Lock()
+        self._accepted_lock = threading.Lock()
+        self.batched_fsync = batched_fsync
+        self._fsync_lock = threading.Lock()
+        self._pending_fds: List[int] = []
+        self._touched_dirs: Set[str] = set()
+        self._process_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='proc')
         self._setup_directories()
+        self._index_existing_submissions()
         
     def _setup_directories(self) -> None:
         """
@@ -139,6 +166,30 @@ class LeetCodeScraper:
         self.accepted_dir = Path('Accepted')
         self.base_dir.mkdir(exist_ok=True)
         self.accepted_dir.mkdir(exist_ok=True)
+        # Per-record paths are built from these strings to avoid Path operations in the hot loop
+        self._base_dir_str = str(self.base_dir)
+        self._accepted_dir_str = str(self.accepted_dir)
+
+    def _index_existing_submissions(self) -> None:
+        """
+        Record the problem directories and submission files already on disk.
+        
+        The index lets previously downloaded submissions be skipped, and
+        existing directories reused, without touching the filesystem for
+        every record.
+        """
+        self._existing_dirs: Set[str] = set()
+        self._existing_timestamps: Dict[str, Set[str]] = {}
+        
+        # scandir entries carry the file type from the directory read, avoiding a stat per entry
+        with os.scandir(self.base_dir) as problem_dirs:
+            for entry in problem_dirs:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                self._existing_dirs.add(entry.name)
+                with os.scandir(entry.path) as files:
+                    self._existing_timestamps[entry.name] = {f.name for f in files}
+        self.logger.debug(f"Indexed {len(self._existing_dirs)} existing problem directories")
 
     def _setup_driver(self) -> webdriver.Chrome:
         """
@@ -209,6 +260,9 @@ class LeetCodeScraper:
         """
         Handle LeetCode login process with retry mechanism.
         
+        The browser is closed as soon as its cookies have been handed over
+        to the HTTP session, so it does not stay resident while fetching.
+        
         Features:
         - Multiple retry attempts
         - Cloudflare verification handling
@@ -220,6 +274,8 @@ class LeetCodeScraper:
         """
         MAX_RETRIES = 3
         self.logger.info("Starting login process")
+        if self.password is None:
+            self.password = getpass.getpass()
         
         for attempt in range(MAX_RETRIES):
             try:
@@ -243,6 +299,13 @@ class LeetCodeScraper:
                 
                 if self.wait.until(EC.url_changes(f'{LEETCODE_URL}/accounts/login/')):
                     self.logger.info("Login successful!")
+                    self._migrate_cookies_to_session()
+                    
+                    # The browser is not needed once the session holds the cookies
+                    self.logger.info("Closing Chrome driver")
+                    self.driver.quit()
+                    self.driver = None
+                    self.wait = None
                     return
                 
             except Exception as e:
@@ -257,14 +320,252 @@ class LeetCodeScraper:
                     self.driver.quit()
                     self.driver = None
 
+    def _migrate_cookies_to_session(self) -> None:
+        """
+        Build a requests session carrying the authenticated browser cookies.
+        
+        The submissions API is queried through this session instead of
+        navigating the browser page by page, which avoids a full page load
+        and DOM read for every batch. The cookies are also saved so that
+        later runs can skip the browser login.
+        """
+        self.logger.debug("Waiting for session cookies")
+        self.wait.until(lambda d: d.get_cookie('LEETCODE_SESSION') and d.get_cookie('csrftoken'))
+        
+        self.logger.debug("Transferring browser cookies to HTTP session")
+        cookies = self.driver.get_cookies()
+        user_agent = self.driver.execute_script('return navigator.userAgent')
+        self._build_session(cookies, user_agent)
+        
+        # Session cookies grant account access, so keep the file private
+        try:
+            self._write_private_file(
+                self.cookie_path,
+                orjson.dumps({'user_agent': user_agent, 'cookies': cookies})
+            )
+            self.logger.debug(f"Saved session cookies to {self.cookie_path}")
+        except OSError as e:
+            # The cache only speeds up later runs; this login is still usable
+            self.logger.warning(f"Could not save session cookies to {self.cookie_path}: {e}")
+
+    def _build_session(self, cookies: List[dict], user_agent: str) -> None:
+        """
+        Create the HTTP session used for all API requests.
+        
+        Args:
+            cookies (List[dict]): Cookies in the format returned by WebDriver
+            user_agent (str): User-Agent of the browser the cookies came from
+        """
+        self.session = requests.Session()
+        # Leave room for the prefetching fetcher and retry transient failures with backoff
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        )
+        self.session.mount('https://', adapter)
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain'),
+                path=cookie.get('path', '/')
+            )
+        
+        self.session.headers.update({
+            'Referer': f'{LEETCODE_URL}/',
+            'User-Agent': user_agent,
+            'x-csrftoken': self.session.cookies.get('csrftoken', '')
+        })
+
+    def _restore_session(self) -> bool:
+        """
+        Try to resume a previous login from saved session cookies.
+        
+        The saved session is validated with a single-record submissions
+        request, which is rejected with 401/403 once the cookies expire.
+        
+        Returns:
+            bool: True if the saved session is still authenticated
+        """
+        if not self.cookie_path.exists():
+            return False
+        
+        self.logger.info("Checking saved session")
+        try:
+            saved = orjson.loads(self.cookie_path.read_bytes())
+            self._build_session(saved['cookies'], saved['user_agent'])
+            response = self.session.get(
+                SUBMISSIONS_API_URL,
+                params={'offset': 0, 'limit': 1, 'lastkey': ''},
+                timeout=30
+            )
+            response.raise_for_status()
+        except Exception as e:
+            self.logger.info(f"Saved session is no longer valid: {e}")
+            self.session = None
+            return False
+        
+        self.logger.info("Reusing saved session, skipping browser login")
+        return True
+
+    @staticmethod
+    def _write_file(path: Union[str, os.PathLike], data: bytes) -> None:
+        """
+        Write a complete file with raw os-level calls.
+        
+        Bypasses Python's buffered I/O layers, which only add overhead when
+        the whole payload is already in memory.
+        
+        Args:
+            path (Union[str, os.PathLike]): Destination file path
+            data (bytes): Complete file contents
+        """
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            LeetCodeScraper._write_all(fd, data)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _write_private_file(path: Union[str, os.PathLike], data: bytes) -> None:
+        """
+        Atomically write a file that only its owner may read.
+        
+        The data goes to a temporary file whose permissions are forced to
+        0600, which is then renamed over the destination. This also tightens
+        the mode of a file left behind with looser permissions.
+        
+        Args:
+            path (Union[str, os.PathLike]): Destination file path
+            data (bytes): Complete file contents
+        """
+        tmp_path = f'{os.fspath(path)}.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            try:
+                # O_CREAT's mode does not apply to a file that already exists
+                if hasattr(os, 'fchmod'):
+                    os.fchmod(fd, 0o600)
+                LeetCodeScraper._write_all(fd, data)
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _write_all(fd: int, data: bytes) -> None:
+        """
+        Write all of data to an open file descriptor, retrying short writes.
+        
+        Args:
+            fd (int): Open file descriptor
+            data (bytes): Bytes to write
+        """
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+
+    def _write_file_deferred(self, path: str, data: bytes) -> None:
+        """
+        Write a file but leave it open until the current batch is synced.
+        
+        Used in batched-fsync mode; see _sync_batch.
+        
+        Args:
+            path (str): Destination file path
+            data (bytes): Complete file contents
+        """
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            self._write_all(fd, data)
+        except Exception:
+            os.close(fd)
+            raise
+        with self._fsync_lock:
+            self._pending_fds.append(fd)
+            self._touched_dirs.add(os.path.dirname(path))
+
+    def _sync_batch(self) -> None:
+        """
+        Flush the files written during the current batch to disk.
+        
+        Each pending file is fsynced and closed, then each directory that
+        received new entries is fsynced once. This is a no-op unless
+        batched fsync is enabled.
+        
+        Every pending descriptor is closed and every directory is attempted
+        even if an individual sync fails.
+        
+        Raises:
+            OSError: The first sync error encountered, after all work is done
+        """
+        with self._fsync_lock:
+            fds, self._pending_fds = self._pending_fds, []
+            dirs, self._touched_dirs = self._touched_dirs, set()
+        
+        error: Optional[OSError] = None
+        for fd in fds:
+            try:
+                os.fsync(fd)
+            except OSError as e:
+                error = error or e
+            finally:
+                os.close(fd)
+        
+        # Directories cannot be opened for fsync on every platform (e.g. Windows)
+        if hasattr(os, 'O_DIRECTORY'):
+            for directory in dirs:
+                try:
+                    dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+                    try:
+                        os.fsync(dir_fd)
+                    finally:
+                        os.close(dir_fd)
+                except OSError as e:
+                    error = error or e
+        
+        if error is not None:
+            raise error
+
+    def _claim_accepted_slug(self, slug: str) -> bool:
+        """
+        Atomically mark a problem as having its accepted solution saved.
+        
+        Submissions are processed concurrently, so the membership test and
+        insertion must happen under one lock for exactly one thread to
+        write each problem's solution.
+        
+        Args:
+            slug (str): Problem identifier
+        
+        Returns:
+            bool: True if the caller should write the accepted solution
+        """
+        with self._accepted_lock:
+            if slug in self.accepted_slugs:
+                return False
+            self.accepted_slugs.add(slug)
+            return True
+
     def _process_submission(self, submission: dict) -> None:
         """
         Process and save a single submission.
         
         This method:
-        1. Creates a Submission object from API response
-        2. Saves full submission data as JSON
-        3. For accepted solutions, saves code file separately
+        1. Skips submissions that are already on disk
+        2. Creates a Submission object from API response
+        3. Saves full submission data as JSON
+        4. For accepted solutions, saves code file separately
         
         Args:
             submission (dict): Raw submission data from LeetCode API
@@ -275,6 +576,14 @@ class LeetCodeScraper:
             2. Accepted/[problem_slug].[extension] - Latest accepted solution
         """
         try:
+            # Already-downloaded records are the common case on re-runs, so check
+            # the index before doing any other work
+            file_name = f"{submission['timestamp']}.json"
+            with self._index_lock:
+                if file_name in self._existing_timestamps.get(submission['title_slug'], ()):
+                    self.logger.debug(f"Skipping existing submission: {submission['title_slug']}")
+                    return
+            
             sub = Submission(
                 title_slug=submission['title_slug'],
                 lang=submission['lang'],
@@ -283,74 +592,130 @@ class LeetCodeScraper:
                 code=submission['code']
             )
             
-            folder_path = self.base_dir / sub.title_slug
-            json_path = folder_path / f'{sub.timestamp}.json'
+            folder_path = f'{self._base_dir_str}/{sub.title_slug}'
+            json_path = f'{folder_path}/{file_name}'
             
-            if json_path.exists():
-                self.logger.debug(f"Skipping existing submission: {sub.title_slug}")
-                return
-
-            folder_path.mkdir(exist_ok=True)
-            with json_path.open('w', encoding='utf-8') as f:
-                json.dump(submission, f, indent=4, ensure_ascii=False)
+            created_dir = False
+            with self._index_lock:
+                if sub.title_slug not in self._existing_dirs:
+                    os.makedirs(folder_path, exist_ok=True)
+                    self._existing_dirs.add(sub.title_slug)
+                    created_dir = True
+            
+            if created_dir and self.batched_fsync:
+                # The new problem directory's entry lives in the base directory
+                with self._fsync_lock:
+                    self._touched_dirs.add(self._base_dir_str)
             
-            if sub.status == 'Accepted' and sub.title_slug not in self.accepted_slugs:
-                self.accepted_slugs.add(sub.title_slug)
+            # Serialize up front so each file is written in a single call
+            data = orjson.dumps(submission, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            if self.batched_fsync:
+                self._write_file_deferred(json_path, data)
+            else:
+                self._write_file(json_path, data)
+            with self._index_lock:
+                self._existing_timestamps.setdefault(sub.title_slug, set()).add(file_name)
+            
+            if sub.status == 'Accepted' and self._claim_accepted_slug(sub.title_slug):
                 extension = LANG_EXTENSIONS.get(sub.lang, sub.lang)
-                accepted_path = self.accepted_dir / f'{sub.title_slug}.{extension}'
-                with accepted_path.open('w', encoding='utf-8') as f:
-                    f.write(sub.code)
+                accepted_path = f'{self._accepted_dir_str}/{sub.title_slug}.{extension}'
+                if self.batched_fsync:
+                    self._write_file_deferred(accepted_path, sub.code.encode('utf-8'))
+                else:
+                    self._write_file(accepted_path, sub.code.encode('utf-8'))
                 self.logger.info(f"Saved accepted solution: {sub.title_slug}")
                 
         except Exception as e:
             self.logger.error(f"Error processing submission {submission.get('title_slug', 'unknown')}: {e}")
 
+    def _fetch_page(self, offset: int) -> List[dict]:
+        """
+        Request and parse a single page of submissions from the API.
+        
+        Runs on the fetcher pool, so decoding the response body happens off
+        the thread that dispatches processing work.
+        
+        Args:
+            offset (int): Index of the first submission in the page
+        
+        Returns:
+            List[dict]: Raw submission records, empty once pagination is exhausted
+        
+        Raises:
+            requests.HTTPError: If the API rejects the request, e.g. with 401/403
+            orjson.JSONDecodeError: If the response body is not valid JSON
+        """
+        response = self.session.get(
+            SUBMISSIONS_API_URL,
+            params={'offset': offset, 'limit': BATCH_SIZE, 'lastkey': ''},
+            timeout=30
+        )
+        # An expired session answers with a JSON error body, which must not read as the last page
+        response.raise_for_status()
+        return orjson.loads(response.content).get('submissions_dump', [])
+
     def fetch_submissions(self) -> None:
         """
         Fetch all submissions using LeetCode's API with parallel processing.
         
+        Requests are issued through the authenticated HTTP session created
+        at login rather than through the browser. The next page is requested
+        in the background while the current one is being written to disk.
+        
         Features:
         - Batch processing with configurable size
         - Parallel processing using ThreadPoolExecutor
+        - Prefetching of the next page
         - Automatic pagination
         - Robust error handling with retries
         """
         self.logger.info("Starting submission fetch")
         offset = 0
         
-        while True:
-            url = f'{LEETCODE_URL}/api/submissions/?offset={offset}&limit={BATCH_SIZE}&lastkey='
-            try:
-                self.driver.get(url)
-                time.sleep(2)
-                
-                body = self.driver.find_element(by=By.TAG_NAME, value='body').text
-                result = json.loads(body)
-                
-                submissions = result.get('submissions_dump', [])
-                if not submissions:
-                    self.logger.info("No more submissions to fetch")
-                    break
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix='fetch') as fetcher:
+            current = fetcher.submit(self._fetch_page, offset)
+            upcoming = None
+            
+            while True:
+                if upcoming is None:
+                    upcoming = fetcher.submit(self._fetch_page, offset + BATCH_SIZE)
+                try:
+                    submissions = current.result()
+                    if not submissions:
+                        self.logger.info("No more submissions to fetch")
+                        upcoming.cancel()
+                        break
 
-                self.logger.info(f"Processing {len(submissions)} submissions from offset {offset}")
-                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                    executor.map(self._process_submission, submissions)
+                    self.logger.info(f"Processing {len(submissions)} submissions from offset {offset}")
+                    # Consume the results so the whole batch finishes before moving on
+                    list(self._process_pool.map(self._process_submission, submissions))
+                    try:
+                        self._sync_batch()
+                    except OSError as e:
+                        self.logger.error(f"Failed to sync submissions at offset {offset}: {e}")
 
-                offset += BATCH_SIZE
-                
-            except json.JSONDecodeError as e:
-                self.logger.error(f"Failed to parse JSON at offset {offset}: {e}")
-                time.sleep(5)
-            except Exception as e:
-                self.logger.error(f"Error fetching submissions at offset {offset}: {e}")
-                time.sleep(5)
+                    offset += BATCH_SIZE
+                    current, upcoming = upcoming, None
+                    
+                except orjson.JSONDecodeError as e:
+                    self.logger.error(f"Failed to parse JSON at offset {offset}: {e}")
+                    time.sleep(5)
+                    current = fetcher.submit(self._fetch_page, offset)
+                except (requests.ConnectionError, requests.Timeout, requests.exceptions.RetryError) as e:
+                    # Raised only once the adapter's own backoff retries are exhausted
+                    self.logger.error(f"Error fetching submissions at offset {offset}: {e}")
+                    current = fetcher.submit(self._fetch_page, offset)
+                except Exception as e:
+                    self.logger.error(f"Error fetching submissions at offset {offset}: {e}")
+                    time.sleep(5)
+                    current = fetcher.submit(self._fetch_page, offset)
 
     def run(self) -> None:
         """
         Execute the main scraping workflow.
         
         Workflow:
-        1. Login to LeetCode
+        1. Resume a saved session, or login to LeetCode
         2. Fetch all submissions
         3. Clean up resources
         
@@ -358,22 +723,40 @@ class LeetCodeScraper:
         proper cleanup of resources even in case of errors.
         """
         try:
-            self.login()
+            if not self._restore_session():
+                self.login()
             self.fetch_submissions()
         except Exception as e:
             self.logger.error(f"Fatal error: {e}")
             raise
         finally:
-            if self.driver:
-                self.logger.info("Closing Chrome driver")
-                self.driver.quit()
+            self._process_pool.shutdown(wait=True)
+            try:
+                self._sync_batch()
+            except OSError as e:
+                # Log instead of raising so the original error is not masked
+                self.logger.error(f"Failed to sync pending submissions: {e}")
+            finally:
+                # Only still open if login failed before the session handoff
+                if self.driver:
+                    self.logger.info("Closing Chrome driver")
+                    self.driver.quit()
+                    self.driver = None
 
 if __name__ == '__main__':
     # Initialize logging and start the scraping process
+    parser = argparse.ArgumentParser(description='Download and organize LeetCode submissions')
+    parser.add_argument(
+        '--batched-fsync',
+        action='store_true',
+        help='fsync downloaded files once per batch instead of leaving flushing to the OS'
+    )
+    args = parser.parse_args()
+    
     logger = setup_logger()
     try:
         logger.info("Starting LeetCode Submission Scraper")
-        scraper = LeetCodeScraper()
+        scraper = LeetCodeScraper(batched_fsync=args.batched_fsync)
         scraper.run()
         logger.info("Scraping completed successfully")
     except Exception as e: